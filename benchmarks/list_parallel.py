@@ -0,0 +1,67 @@
+"""Compares ManagedObjectHandler.list() with and without workers on generated class query pages.
+
+Usage: python benchmarks/list_parallel.py [pages] [page_size] [latency] [codec]
+latency is seconds added to every page fetch to simulate APIC response time, defaults to 0.
+codec is 'json' or 'orjson', defaults to the fastest installed.
+"""
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).absolute().parent.parent / "swiftpyaci"))
+
+from swiftpyaci.src.codec import default_codec, set_default_codec
+from swiftpyaci.src.managed_object import ManagedObjectHandler
+
+
+META = pathlib.Path(__file__).absolute().parent.parent / "swiftpyaci/swiftpyaci/test/.meta_data/fvTenant.json"
+
+
+class BenchRequestHandler:
+    def __init__(self, pages, page_size, latency):
+        self.page_size = page_size
+        self.latency = latency
+        self.total = pages * page_size
+        self.codec = default_codec()
+        self.meta = json.loads(META.read_text())
+        # Payloads are generated up front so that only the library is measured
+        self.pages = [self.payload(start, min(start + page_size, self.total)) for start in range(0, self.total, page_size)]
+        self.all = self.payload(0, self.total)
+
+    def tenant(self, i):
+        attributes = {"dn": f"uni/tn-Tenant{i}", "name": f"Tenant{i}"}
+        attributes.update({f"attr{a}": f"value-{a}-{i}" for a in range(23)})
+        return {"fvTenant": {"attributes": attributes}}
+
+    def payload(self, start, stop):
+        return self.codec.dumps({"totalCount": str(self.total), "imdata": [self.tenant(i) for i in range(start, stop)]})
+
+    def get(self, uri, params = None, use_api_uri = True):
+        if not use_api_uri:
+            return self.meta
+        time.sleep(self.latency)
+        return self.codec.loads(self.pages[params["page"]])
+
+    def list(self, uri, params = None):
+        # Serial list() gets everything in one response, latency is paid once per page worth of data
+        time.sleep(self.latency * (self.total // self.page_size))
+        return self.codec.loads(self.all)["imdata"]
+
+
+def bench(handler, **kwargs):
+    start = time.perf_counter()
+    count = sum(1 for mo in handler.list(**kwargs))
+    return count, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    pages, page_size, latency = int(sys.argv[1]) if len(sys.argv) > 1 else 8, int(sys.argv[2]) if len(sys.argv) > 2 else 10000, float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    if len(sys.argv) > 4:
+        set_default_codec(sys.argv[4])
+    req = BenchRequestHandler(pages, page_size, latency)
+    handler = ManagedObjectHandler("fvTenant", request_handler = req)
+    print(f"codec: {req.codec.name}, {pages} pages x {page_size} objects, latency {latency}s per page")
+    print("serial:    %d objects in %.2fs" % bench(handler))
+    for workers in [2, 4]:
+        print(f"workers={workers}: %d objects in %.2fs" % bench(handler, workers = workers, page_size = page_size))
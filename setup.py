@@ -26,6 +26,7 @@ setup(
     install_requires=["httpx >= 0.25.2"],
     extras_require={
         "dev": ["pytest>=7.0", "twine>=4.0.2"],
+        "fast": ["orjson>=3.9"],
     },
     python_requires=">=3.10",
 )
\ No newline at end of file
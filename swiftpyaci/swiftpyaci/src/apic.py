@@ -1,9 +1,9 @@
-import requests
 import logging
 
 from .managed_object import ManagedObject, ManagedObjectHandler
-from .class_meta import ClassMeta, get_class_meta
+from .class_meta import get_cached_class_meta
 from .request_handler import RequestHandler
+from .config_export import ConfigExporter, ConfigImporter
 
 
 
@@ -27,16 +27,53 @@ class APIC:
         return True
 
     def mo(self, class_name, dn = None, load = False, **kwargs):
-        return ManagedObject(class_name, dn, request_handler = self.request_handler, class_meta = ClassMeta(**get_class_meta(self.request_handler,class_name)), load = False, **kwargs)
+        return ManagedObject(class_name, dn, request_handler = self.request_handler, class_meta = get_cached_class_meta(self.request_handler, class_name), load = False, **kwargs)
     
     def class_meta(self, class_name):
-        return ClassMeta(**get_class_meta(self.request_handler,class_name))
+        return get_cached_class_meta(self.request_handler, class_name)
 
-    def get(self,class_name = None, dn = None,  **kwargs):
+    def get(self,class_name = None, dn = None, lazy = False, **kwargs):
         if dn and not class_name and not kwargs:
-            return ManagedObject(None, dn, request_handler = self.request_handler, load = True)
+            return ManagedObject(None, dn, request_handler = self.request_handler, load = True, lazy = lazy)
         return ManagedObjectHandler(class_name, request_handler = self.request_handler).get(**kwargs)
 
+    def get_many(self, dns, class_name = None, workers = 8, **kwargs):
+        """Gets many objects by DN.
+
+        Args:
+            dns (list or dict): List of DNs, or dict with class name as key and list of DNs as value.
+            class_name (str, optional): Class of all DNs in a list. Defaults to None.
+            workers (int, optional): Number of requests to run in parallel. Defaults to 8.
+        kwargs:
+            Passed to ManagedObjectHandler.get_many, i.e chunk_size.
+
+        Returns:
+            dict: ManagedObjects by DN. DNs that does not exist are left out.
+        """
+        if isinstance(dns, dict):
+            res = dict()
+            for class_name, class_dns in dns.items():
+                res.update(self.get_many(class_dns, class_name = class_name, workers = workers, **kwargs))
+            return res
+
+        if class_name:
+            return ManagedObjectHandler(class_name, request_handler = self.request_handler).get_many(dns, workers = workers, **kwargs)
+
+        # Class is unknown, read each DN once and build the objects from those reads
+        from concurrent.futures import ThreadPoolExecutor
+        dns = list(dict.fromkeys(dns))
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            reads = list(pool.map(lambda dn: self.request_handler.get_mo(f"mo/{dn}", params = {"rsp-prop-include": "all"}), dns))
+
+        res = dict()
+        for dn, mo_data in zip(dns, reads):
+            if not mo_data:
+                continue
+            class_name = next(iter(mo_data))
+            res[dn] = ManagedObject(class_name, dn, request_handler = self.request_handler, class_meta = get_cached_class_meta(self.request_handler, class_name))
+            res[dn].set_loaded("all", mo_data)
+        return res
+
     def list(self,class_name, **kwargs):
         return ManagedObjectHandler(class_name, request_handler = self.request_handler).list(**kwargs)
 
@@ -46,6 +83,16 @@ class APIC:
     def get_or_create(self,class_name, **kwargs):
         return ManagedObjectHandler(class_name, request_handler = self.request_handler).get_or_create(**kwargs)
 
+    def export_config(self, dn, path, classes = None, **kwargs):
+        """Streams config of subtree dn to chunked, compressed JSONL files in path, kwargs are passed to ConfigExporter.
+        """
+        return ConfigExporter(self.request_handler, path, **kwargs).export(dn, classes = classes)
+
+    def import_config(self, path, **kwargs):
+        """Imports config exported with export_config, kwargs are passed to ConfigImporter.
+        """
+        return ConfigImporter(self.request_handler, path, **kwargs).import_config()
+
     def __getattr__(self, class_name):
         return ManagedObjectHandler(class_name, request_handler = self.request_handler)
 
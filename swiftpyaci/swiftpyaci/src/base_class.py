@@ -1,5 +1,4 @@
-import json
-import yaml
+from .codec import default_codec
 class Base:
     
 
@@ -41,9 +40,10 @@ class Base:
         return res
 
     def json(self):
-        return json.dumps(self.serilize())
+        return default_codec().dumps_str(self.serilize())
     
     def yaml(self):
+        import yaml
         return yaml.dump(self.serilize())
     
 class Generic(Base):
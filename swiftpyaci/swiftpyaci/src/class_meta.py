@@ -1,4 +1,6 @@
 import re
+import threading
+import weakref
 
 from .base_class import Base
 
@@ -107,4 +109,19 @@ def get_class_meta(request_handler, class_name):
 
     resp = request_handler.get(f"doc/jsonmeta/{category}/{name}", use_api_uri = False)
     return resp.get(full_class_name,{})
-    
+
+
+_class_metas = weakref.WeakKeyDictionary()
+_class_metas_lock = threading.Lock()
+
+
+def get_cached_class_meta(request_handler, class_name):
+    """Returns ClassMeta for class_name, meta is only fetched once per request handler and class.
+    """
+    with _class_metas_lock:
+        class_metas = _class_metas.setdefault(request_handler, dict())
+        if class_name in class_metas:
+            return class_metas[class_name]
+    class_meta = ClassMeta(**get_class_meta(request_handler, class_name))
+    with _class_metas_lock:
+        return class_metas.setdefault(class_name, class_meta)
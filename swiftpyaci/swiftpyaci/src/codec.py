@@ -0,0 +1,82 @@
+import json
+
+
+class JsonCodec:
+    """Codec using stdlib json. Used when no faster json library is installed.
+    """
+    name = "json"
+
+    def loads(self, data):
+        """Decodes json from bytes or str
+        """
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encodes obj to json
+
+        Returns:
+            bytes: utf-8 encoded json
+        """
+        return json.dumps(obj).encode()
+
+    def dumps_str(self, obj):
+        """Encodes obj to json str, always with stdlib json so that output of json() does not depend on which codec is used.
+        """
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec using orjson, works on bytes directly so no str copies are needed for request and response bodies.
+    dumps_str is inherited from JsonCodec since orjson output differs from stdlib json, i.e no spaces after separators.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.__orjson = orjson
+
+    def loads(self, data):
+        return self.__orjson.loads(data)
+
+    def dumps(self, obj):
+        return self.__orjson.dumps(obj)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+}
+
+_default_codec = None
+
+
+def get_codec(name = None):
+    """Returns codec by name, if name is not passed then the fastest installed codec is returned.
+
+    Args:
+        name (str, optional): 'json' or 'orjson'. Defaults to None.
+    """
+    if name:
+        if name not in CODECS:
+            raise KeyError(f"Codec '{name}' is invalid, valid codecs are '{list(CODECS)}'")
+        return CODECS[name]()
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return JsonCodec()
+
+
+def default_codec():
+    """Returns the codec shared by RequestHandler and serialization, it's created on first use.
+    """
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = get_codec()
+    return _default_codec
+
+
+def set_default_codec(codec):
+    """Sets the shared codec, codec can be a codec name or a codec instance.
+    """
+    global _default_codec
+    _default_codec = get_codec(codec) if type(codec) == str else codec
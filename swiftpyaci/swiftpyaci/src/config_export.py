@@ -0,0 +1,211 @@
+import gzip
+import logging
+import pathlib
+import threading
+from collections import deque
+
+from .codec import default_codec
+from .managed_object import split_dn
+
+
+class ChunkWriter:
+    """Writes lines to gzip compressed files named <prefix>-<chunk>.jsonl.gz, a new file is started every chunk_size lines.
+    """
+    def __init__(self, path, prefix, chunk_size):
+        self.path = pathlib.Path(path)
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.chunk = 0
+        self.lines = 0
+        self.file = None
+
+    def write(self, line):
+        if self.file is None or self.lines >= self.chunk_size:
+            self.close()
+            self.file = gzip.open(self.path / f"{self.prefix}-{self.chunk:05}.jsonl.gz", "wb")
+            self.chunk += 1
+            self.lines = 0
+        self.file.write(line + b"\n")
+        self.lines += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class ConfigExporter:
+    """Streams the configuration of a subtree from APIC to chunked, gzip compressed JSONL files.
+    The subtree is fetched page by page and objects are written as they arrive, one set of files per DN depth so that ConfigImporter can restore parents before children.
+    """
+    def __init__(self, request_handler, path, page_size = 10000, chunk_size = 50000):
+        self.log = logging.getLogger()
+        self.request_handler = request_handler
+        self.path = pathlib.Path(path)
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+        self.codec = getattr(request_handler, "codec", None) or default_codec()
+
+    def pages(self, dn, params):
+        """Yields objects from all pages of a subtree query on dn.
+        """
+        page = 0
+        while True:
+            self.log.debug(f"Exporting page {page} of '{dn}'")
+            resp = self.request_handler.get(f"mo/{dn}", params = {"query-target": "subtree", "page-size": self.page_size, **params, "page": page})
+            imdata = resp.get("imdata", [])
+            yield from imdata
+            page += 1
+            if not imdata or page * self.page_size >= int(resp.get("totalCount", 0)):
+                break
+
+    def subtree_classes(self, dn):
+        """Classes in the subtree of dn, found with a naming-only walk of the subtree.
+        """
+        classes = dict()
+        for mo in self.pages(dn, {"rsp-prop-include": "naming-only"}):
+            classes.setdefault(next(iter(mo)))
+        return list(classes)
+
+    def walk(self, dn, classes = None):
+        """Yields config-only objects in the subtree of dn, including dn itself.
+        APIC can only order by the properties of one class, so the subtree is paged one class at a time ordered by dn. Otherwise objects can be skipped or repeated between pages.
+
+        Args:
+            dn (str): DN of subtree root, i.e 'uni/tn-Tenant' or 'uni'.
+            classes (list, optional): Only include objects of these classes. Defaults to None, which exports all classes in the subtree.
+        """
+        for class_name in classes or self.subtree_classes(dn):
+            yield from self.pages(dn, {"target-subtree-class": class_name, "rsp-prop-include": "config-only", "order-by": f"{class_name}.dn"})
+
+    def export(self, dn, classes = None):
+        """Exports subtree of dn to path.
+        path must not contain files from an earlier export since ConfigImporter imports all export files in path.
+
+        Returns:
+            int: Number of exported objects
+        """
+        self.path.mkdir(parents = True, exist_ok = True)
+        if next(self.path.glob("depth-*.jsonl.gz"), None):
+            raise FileExistsError(f"'{self.path}' already contains an export")
+        writers = dict()
+        count = 0
+        try:
+            for mo in self.walk(dn, classes = classes):
+                depth = len(split_dn(next(iter(mo.values()))["attributes"]["dn"]))
+                if depth not in writers:
+                    writers[depth] = ChunkWriter(self.path, f"depth-{depth:03}", self.chunk_size)
+                writers[depth].write(self.codec.dumps(mo))
+                count += 1
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        self.log.info(f"Exported {count} objects from '{dn}' to '{self.path}'")
+        return count
+
+
+class ConfigImporter:
+    """Replays an export from ConfigExporter as batched POSTs.
+    Depths are imported in order and all POSTs for one depth are done before the next depth starts, within a depth POSTs run in parallel.
+    Objects are posted as children of their parent. Parent classes are taken from the objects imported at the depth before, parents outside the export are looked up from APIC. If the parent does not exist the object is posted to its own DN.
+    """
+    def __init__(self, request_handler, path, batch_size = 1000, workers = 4):
+        self.log = logging.getLogger()
+        self.request_handler = request_handler
+        self.path = pathlib.Path(path)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.codec = getattr(request_handler, "codec", None) or default_codec()
+        self.parent_classes = dict() # classes of the objects at the depth before the one being imported
+        self.lookups = dict() # bounded to batch_size entries
+        self.lookups_lock = threading.Lock()
+
+    def read(self):
+        """Yields (depth, mo) from all export files, ordered by depth.
+        """
+        for file in sorted(self.path.glob("depth-*.jsonl.gz")):
+            depth = int(file.name.split("-")[1])
+            with gzip.open(file, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        yield depth, self.codec.loads(line)
+
+    def parent_class(self, parent_dn):
+        """Class name of parent_dn, None if it does not exist.
+        """
+        if not parent_dn:
+            return None
+        if parent_dn in self.parent_classes:
+            return self.parent_classes[parent_dn]
+        with self.lookups_lock:
+            if parent_dn in self.lookups:
+                return self.lookups[parent_dn]
+        mo_data = self.request_handler.get_mo(f"mo/{parent_dn}", params = {"rsp-prop-include": "naming-only"})
+        parent_class = next(iter(mo_data), None)
+        with self.lookups_lock:
+            if len(self.lookups) >= self.batch_size:
+                self.lookups.clear()
+            self.lookups[parent_dn] = parent_class
+        return parent_class
+
+    def post_children(self, parent_dn, children):
+        parent_class = self.parent_class(parent_dn)
+        if parent_class:
+            self.request_handler.post(f"mo/{parent_dn}", data = {parent_class: {"attributes": {"dn": parent_dn}, "children": children}})
+            return
+        for mo in children:
+            self.request_handler.post(f"mo/{next(iter(mo.values()))['attributes']['dn']}", data = mo)
+
+    def import_config(self):
+        """Imports all objects in path.
+
+        Returns:
+            int: Number of imported objects
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        count = 0
+        depth = None
+        batch = dict()
+        batch_len = 0
+        pending = deque()
+        classes = dict()
+
+        def flush():
+            for parent_dn, children in batch.items():
+                pending.append(pool.submit(self.post_children, parent_dn, children))
+            batch.clear()
+            # Keep a bounded number of batches in flight
+            while len(pending) > self.workers * 2:
+                pending.popleft().result()
+
+        def wait():
+            while pending:
+                pending.popleft().result()
+
+        with ThreadPoolExecutor(max_workers = self.workers) as pool:
+            for mo_depth, mo in self.read():
+                if mo_depth != depth:
+                    flush()
+                    wait()
+                    # No posts are running, objects of the depth just imported are the parents of the next depth
+                    self.parent_classes = classes if depth is not None and mo_depth == depth + 1 else dict()
+                    classes = dict()
+                    self.log.debug(f"Importing depth {mo_depth}")
+                    batch_len = 0
+                    depth = mo_depth
+
+                class_name, data = next(iter(mo.items()))
+                dn = data["attributes"]["dn"]
+                classes[dn] = class_name
+                batch.setdefault("/".join(split_dn(dn)[:-1]), list()).append(mo)
+                batch_len += 1
+                count += 1
+                if batch_len >= self.batch_size:
+                    flush()
+                    batch_len = 0
+            flush()
+            wait()
+
+        self.log.info(f"Imported {count} objects from '{self.path}'")
+        return count
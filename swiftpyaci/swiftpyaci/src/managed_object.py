@@ -1,36 +1,86 @@
 import logging
-import json
-import re
-import yaml
+from collections import deque
 from copy import deepcopy
 from .base_class import Base
 from .base_class import Generic
-from .class_meta import ClassMeta, get_class_meta
-
+from .class_meta import get_cached_class_meta
+from .codec import default_codec
+
+
+PROPERTY_GROUPS = {
+    "naming": "naming-only",
+    "config": "config-only",
+    "all": "all",
+}
+
+
+def split_dn(dn):
+    """Splits DN into RNs, slashes inside brackets are kept, also for nested brackets, i.e 'uni/tn-a/ap-b/epg-c/rspathAtt-[topology/pod-1/paths-101/pathep-[eth1/1]]'.
+    """
+    res = list()
+    depth = 0
+    start = 0
+    for i, c in enumerate(dn):
+        if c == "[":
+            depth += 1
+        elif c == "]":
+            depth = max(depth - 1, 0)
+        elif c == "/" and depth == 0 and (i == 0 or dn[i - 1] != "\\"):
+            res.append(dn[start:i])
+            start = i + 1
+    res.append(dn[start:])
+    return res
+
+
+def get_parent_dn(dn):
+    """Parent DN of dn, 'topRoot' if dn has no parent.
+    """
+    # Remove the last component (the child itself) to get the parent components
+    parent_components = split_dn(dn)[:-1]
+    if parent_components:
+        # Join the parent components to form the parent DN
+        return '/'.join(parent_components)
+    return "topRoot"
 
 
 class ManagedObject:
-    def __init__(self, class_name = None, dn = None,rn = None,parent_dn = None,  class_meta = None, request_handler = None, load = False, **kwargs):
-        self.__log = logging.getLogger()
-        self.__class_name = class_name
-        self.__class_meta = class_meta
-        self.__dn = dn
-        self.__rn = rn
-        self.__parent_dn = parent_dn
-        self.__parent = None
-        self.__req = request_handler
-        self.__cache_attributes = None
-        self.__exists = None
-        self.__children = list()
+    def __init__(self, class_name = None, dn = None,rn = None,parent_dn = None,  class_meta = None, request_handler = None, load = False, lazy = False, **kwargs):
+        # Private state is set in one go instead of through __setattr__, it's a large part of the cost when listing many objects
+        self.__dict__.update({
+            "_ManagedObject__log": logging.getLogger(),
+            "_ManagedObject__lazy": lazy,
+            "_ManagedObject__loaded_props": set(),
+            "_ManagedObject__class_name": class_name,
+            "_ManagedObject__class_meta": class_meta,
+            "_ManagedObject__dn": dn,
+            "_ManagedObject__rn": rn,
+            "_ManagedObject__parent_dn": parent_dn,
+            "_ManagedObject__parent": None,
+            "_ManagedObject__req": request_handler,
+            "_ManagedObject__cache_attributes": None,
+            "_ManagedObject__exists": None,
+            "_ManagedObject__children": list(),
+        })
         
         self.set_attrs(**kwargs) # need before load so that we can construct dn and rn
-        if load:
+        if load and not lazy:
             self.__log.debug("Loading data from APIC")
             self.load()
             self.set_attrs(**kwargs) # need again to find any changes passed in kwargs
         self.set_dn()
         self.set_parent_dn()
 
+    @classmethod
+    def from_attributes(cls, class_name, dn, parent_dn, attributes, class_meta = None, request_handler = None):
+        """Builds an object from attributes listed from APIC. Attributes are put in __dict__ in one go instead of one setattr per attribute, which is most of the cost when listing many objects.
+
+        Args:
+            attributes (dict): Attributes without 'dn'.
+        """
+        mo = cls(class_name, dn, parent_dn = parent_dn, class_meta = class_meta, request_handler = request_handler)
+        mo.__dict__.update(attributes)
+        return mo
+
     @property
     def dn(self):
         if not self.__dn:
@@ -54,7 +104,7 @@ class ManagedObject:
     def rn(self):
         if self.__rn:
             return self.__rn
-        return self.__class_meta.rn(**{id_attr: getattr(self,id_attr) for id_attr in self.__class_meta.identified_by})
+        return self.class_meta.rn(**{id_attr: getattr(self,id_attr) for id_attr in self.class_meta.identified_by})
 
     @property
     def parent_dn(self):
@@ -84,6 +134,40 @@ class ManagedObject:
         #    raise ValueError(f"{name} is not a valid attribute")
         
         super().__setattr__(name, value)
+
+    def __getattr__(self, name):
+        """Only called when name is not set, in lazy mode the property group holding name is loaded from APIC on first access.
+        """
+        if name.startswith("_") or not self.__dict__.get("_ManagedObject__lazy") or not self.__dict__.get("_ManagedObject__req"):
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        if not self.__class_meta and not self.__class_name:
+            # Created from DN only, config properties holds most attributes and gives the class name without a class meta lookup
+            lazy_props = ["config", "all"]
+        else:
+            lazy_props = self.lazy_props(name)
+        for props in lazy_props:
+            self.ensure_loaded(props)
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
+    def lazy_props(self, name):
+        """Property groups to load, in order, to find attribute name. Without class meta everything is loaded at once.
+        """
+        properties = getattr(self.class_meta, "properties", None)
+        if properties and name in properties.list_attributes():
+            prop = getattr(properties, name)
+            if prop.is_naming():
+                return ["naming", "all"]
+            if prop.is_configurable():
+                return ["config", "all"]
+        return ["all"]
+
+    def ensure_loaded(self, props = "all"):
+        """In lazy mode, loads property group props unless it is already loaded.
+        """
+        if self.__lazy and self.__req and props not in self.__loaded_props:
+            self.load_props(props)
         
 
 
@@ -96,6 +180,13 @@ class ManagedObject:
         return f"{self.class_name}({','.join(res)})"
 
     def __iter__(self):
+        # Iterating reads the whole object, so lazy objects are fully loaded first
+        self.ensure_loaded("all")
+        yield from self.iter_attributes()
+
+    def iter_attributes(self):
+        """Iterates attributes that are set, without loading anything in lazy mode.
+        """
         yield ("dn",self.dn)
         for k, v in self.__dict__.items():
             if not k.startswith("_"):
@@ -104,10 +195,14 @@ class ManagedObject:
 
     @property
     def class_name(self):
+        if not self.__class_name:
+            self.ensure_loaded("naming")
         return self.__class_name
     
     @property
     def class_meta(self):
+        if not self.__class_meta and self.__lazy and self.__req and self.class_name:
+            self.__class_meta = get_cached_class_meta(self.__req, self.class_name)
         return self.__class_meta
 
     @property
@@ -116,6 +211,8 @@ class ManagedObject:
 
     @property
     def exists(self):
+        if self.__exists is None:
+            self.ensure_loaded("naming")
         return self.__exists
     
     @property
@@ -143,13 +240,13 @@ class ManagedObject:
 
         # Load MO data from APIC
         mo_data = self.__req.get_mo(self.uri, params = {"rsp-prop-include": "all"})
-        if not self.__class_meta:
-            self.__class_meta = ClassMeta(**get_class_meta(self.__req,next(iter(mo_data))))
-        if not self.__class_name:
-            self.__class_name = self.__class_meta.class_name
         if not mo_data:
             self.__exists = False
             return False
+        if not self.__class_meta:
+            self.__class_meta = get_cached_class_meta(self.__req, next(iter(mo_data)))
+        if not self.__class_name:
+            self.__class_name = self.__class_meta.class_name
         self.__exists = True
         self.set_attrs(**mo_data.get(self.class_name, {}).get("attributes"))
 
@@ -157,6 +254,45 @@ class ManagedObject:
             child.load()
 
         self.set_cache()
+        self.__loaded_props.update(PROPERTY_GROUPS)
+        return True
+
+    def load_props(self, props = "all"):
+        """Loads one property group from APIC, used by lazy mode. Attributes that are already set are kept so that local changes are not lost.
+
+        Args:
+            props (str, optional): 'naming', 'config' or 'all'. Defaults to "all".
+
+        Returns:
+            bool: True if object exists
+        """
+        if not self.__req:
+            raise ConnectionError("Offline mode, cannot load Managed Object")
+        if props not in PROPERTY_GROUPS:
+            raise KeyError(f"Property group '{props}' is invalid, valid groups are '{list(PROPERTY_GROUPS)}'")
+
+        self.__log.debug(f"Loading '{props}' properties for '{self.dn}'")
+        mo_data = self.__req.get_mo(self.uri, params = {"rsp-prop-include": PROPERTY_GROUPS[props]})
+        return self.set_loaded(props, mo_data)
+
+    def set_loaded(self, props, mo_data):
+        """Merges loaded data for a property group into this object and its cache.
+
+        Args:
+            props (str): Property group that mo_data was loaded with.
+            mo_data (dict): Object from APIC imdata, i.e {"fvTenant": {"attributes": {...}}}.
+        """
+        self.__loaded_props.update(PROPERTY_GROUPS if props == "all" or not mo_data else [props])
+        if not mo_data:
+            self.__exists = False
+            return False
+        self.__exists = True
+        if not self.__class_name:
+            self.__class_name = next(iter(mo_data))
+
+        attributes = mo_data.get(self.__class_name, {}).get("attributes", {})
+        self.__cache_attributes = {**self.get_cache(), **attributes}
+        self.set_attrs(**{k: v for k,v in attributes.items() if k != "dn" and k not in self.__dict__})
         return True
 
     def save_data(self):
@@ -191,25 +327,35 @@ class ManagedObject:
     def set_parent_dn(self):
         
         if not self.__parent_dn:
-            # Use a regular expression to split the DN into components
-            components = re.split(r'(?<!\\)/(?![^\[]*\])', self.dn)
-
-            # Remove the last component (the child itself) to get the parent components
-            parent_components = components[:-1]
-
-            if parent_components:
-                # Join the parent components to form the parent DN
-                self.__parent_dn = '/'.join(parent_components)
-            else:
-                self.__parent_dn = "topRoot"
+            self.__parent_dn = get_parent_dn(self.dn)
 
     def resolve_parent(self):
         if self.__parent_dn != "topRoot":
             self.__log.debug(f"Getting parent with DN '{self.parent_dn}'")
-            self.__parent = ManagedObject(dn = self.parent_dn, request_handler = self.__req, load = True)
+            self.__parent = ManagedObject(dn = self.parent_dn, request_handler = self.__req, load = not self.__lazy, lazy = self.__lazy)
         else:
             self.__log.debug(f"'{self.dn}' does not have any parent")
 
+    def list_children(self, class_name = None):
+        """Lists children from APIC as lazy objects, only naming properties are fetched until other attributes are accessed.
+
+        Args:
+            class_name (str, optional): Only list children of this class. Defaults to None.
+
+        Yields:
+            ManagedObject: lazy child objects
+        """
+        if not self.__req:
+            raise ConnectionError("Offline mode, cannot list children for Managed Object")
+        params = {"query-target": "children", "rsp-prop-include": "naming-only"}
+        if class_name:
+            params.update({"target-subtree-class": class_name})
+        for mo in self.__req.list(self.uri, params = params):
+            child_class, data = next(iter(mo.items()))
+            child = ManagedObject(class_name = child_class, dn = data.get("attributes", {}).get("dn"), parent_dn = self.dn, class_meta = get_cached_class_meta(self.__req, child_class), request_handler = self.__req, lazy = True)
+            child.set_loaded("naming", mo)
+            yield child
+
     def subtree(self):
         if not self.__req:
             raise ConnectionError("Offline mode, cannot get subtree for Managed Object")
@@ -273,8 +419,10 @@ class ManagedObject:
     def set_attrs(self, **kwargs):
         """Sets attributes from kwargs
         """
+        debug = self.__log.isEnabledFor(logging.DEBUG)
         for k,v in kwargs.items():
-            self.__log.debug(f"Setting attr '{k}'")
+            if debug:
+                self.__log.debug(f"Setting attr '{k}'")
             setattr(self, k,v)
 
     def list_attributes(self):
@@ -288,13 +436,14 @@ class ManagedObject:
         return {self.class_name: res}
         
     def config(self):
-        return self.serilize(include = 'dn',isConfigurable = True)
+        return self.serilize(include = 'dn', props = "config", isConfigurable = True)
 
-    def serilize_attributes(self, include = None, **kwargs):
+    def serilize_attributes(self, include = None, props = "all", **kwargs):
         """Serilizes attributes to dict
 
         Args:
             include (list or string, optional): List of or string with 1 property to be included in result. Defaults to None.
+            props (str, optional): Property group to load first in lazy mode, 'naming', 'config' or 'all'. Defaults to "all".
         kwargs:
             Kwargs will be treated as property filterm i.e isMandatory = True will include all mandatory attributes.
 
@@ -303,12 +452,14 @@ class ManagedObject:
         """
 
 
+        self.ensure_loaded(props)
+
         # attributes show be a dict of attributes filter, or all
         include_all_attributes = False
 
         include_attributes = list()
         if kwargs:
-            include_attributes = self.__class_meta.properties.filter(**kwargs)
+            include_attributes = self.class_meta.properties.filter(**kwargs)
 
         if type(include) == list:
             include_attributes = include_attributes + include
@@ -316,7 +467,7 @@ class ManagedObject:
             include_attributes.append(include)
 
         res = dict()
-        for k,v in self:
+        for k,v in self.iter_attributes():
             if k in include_attributes or len(include_attributes) == 0:
                 res.update({k: v})
         
@@ -334,9 +485,10 @@ class ManagedObject:
         return res
 
     def json(self):
-        return json.dumps(self.serilize())
+        return default_codec().dumps_str(self.serilize())
     
     def yaml(self):
+        import yaml
         return yaml.dump(self.serilize())
 
 
@@ -345,7 +497,7 @@ class ManagedObjectHandler:
     def __init__(self,class_name, request_handler = None):
         self.class_name = class_name
         self.request_handler = request_handler
-        self.class_meta = ClassMeta(**get_class_meta(self.request_handler,class_name))
+        self.class_meta = get_cached_class_meta(self.request_handler, class_name)
 
     def __str__(self):
         return repr(self)
@@ -364,13 +516,91 @@ class ManagedObjectHandler:
             raise ValueError(f"Tried to get '{mo.class_name}:{mo.dn}' but got no result. Object does not exist")
         return mo
         
-    def list(self, load = True, params = None, **kwargs):
+    def get_many(self, dns, chunk_size = 50, workers = 4):
+        """Gets many objects of this class with filtered class queries, chunk_size DNs per query.
+
+        Args:
+            dns (list): DNs to get.
+            chunk_size (int, optional): DNs per class query, keeps the query filter within URL length limits. Defaults to 50.
+            workers (int, optional): Number of queries to run in parallel. Defaults to 4.
+
+        Returns:
+            dict: ManagedObjects by DN in the order of dns. DNs that does not exist are left out.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        dns = list(dict.fromkeys(dns))
+        chunks = [dns[i:i + chunk_size] for i in range(0, len(dns), chunk_size)]
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            found = {mo.dn: mo for chunk in pool.map(self.list_dns, chunks) for mo in chunk}
+
+        return {dn: found[dn] for dn in dns if dn in found}
+
+    def list_dns(self, dns):
+        """Gets objects for dns with one class query, objects are loaded as with get()
+        """
+        dn_filter = ",".join(f'eq({self.class_name}.dn,"{dn}")' for dn in dns)
+        if len(dns) > 1:
+            dn_filter = f"or({dn_filter})"
+        res = list()
+        for mo_data in self.request_handler.list(f"class/{self.class_name}", params = self.params_parser(query_target_filter = dn_filter)):
+            mo = ManagedObject(class_name = self.class_name, dn = next(iter(mo_data.values()))["attributes"]["dn"], request_handler = self.request_handler, class_meta = self.class_meta)
+            mo.set_loaded("all", mo_data)
+            res.append(mo)
+        return res
+
+    def list(self, load = True, params = None, workers = None, **kwargs):
+        if workers:
+            yield from self.list_parallel(workers, **kwargs)
+            return
         parsed_params = self.params_parser(**kwargs)
         resp = self.request_handler.list(f"class/{self.class_name}", params=parsed_params)
-        for mo in resp:
-            this = list(mo.values())[0].get("attributes",{})
-            yield ManagedObject(class_name = self.class_name, dn = this.pop("dn"), request_handler = self.request_handler, class_meta = self.class_meta, load = False, **this)
+        yield from self.from_imdata(resp)
     
+    def list_parallel(self, workers, page_size = 10000, **kwargs):
+        """Lists objects page by page. Up to workers pages are fetched and decoded in parallel threads while the caller builds objects from earlier pages.
+        Threads are used rather than processes since sending decoded pages back from a process costs as much as decoding them.
+
+        Args:
+            workers (int): Number of pages to fetch in parallel.
+            page_size (int, optional): Objects per page. Defaults to 10000.
+        kwargs:
+            Query parameters, see params_parser. 'page' is ignored since all pages are fetched. 'order_by' defaults to '<class_name>.dn' since APIC paging is not stable without it.
+
+        Yields:
+            ManagedObject: objects in the same order as APIC returns them.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        kwargs.pop("page", None)
+        kwargs.setdefault("order_by", f"{self.class_name}.dn")
+        uri = f"class/{self.class_name}"
+
+        def fetch(page):
+            return self.request_handler.get(uri, params = self.params_parser(page = page, page_size = page_size, **kwargs))
+
+        # The first page is needed to know the number of pages
+        resp = fetch(0)
+        pages = -(-int(resp.get("totalCount", 0)) // page_size)
+        yield from self.from_imdata(resp.get("imdata", []))
+
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            # Keep a bounded number of pages in flight so memory does not grow with the fabric size
+            pending = deque(pool.submit(fetch, page) for page in range(1, min(pages, workers * 2 + 1)))
+            next_page = len(pending) + 1
+            while pending:
+                resp = pending.popleft().result()
+                if next_page < pages:
+                    pending.append(pool.submit(fetch, next_page))
+                    next_page += 1
+                yield from self.from_imdata(resp.get("imdata", []))
+
+    def from_imdata(self, imdata):
+        """Builds ManagedObjects from APIC imdata of this class
+        """
+        for mo in imdata:
+            this = next(iter(mo.values())).get("attributes", {})
+            dn = this.pop("dn")
+            yield ManagedObject.from_attributes(self.class_name, dn, get_parent_dn(dn), this, class_meta = self.class_meta, request_handler = self.request_handler)
+
     def create(self, save = False, **kwargs):
         mo = ManagedObject(class_name = self.class_name, load = True, request_handler = self.request_handler, class_meta = self.class_meta, **kwargs)
         if mo.exists:
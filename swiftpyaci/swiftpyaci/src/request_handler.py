@@ -1,16 +1,27 @@
-import requests
 import logging
+import threading
+from concurrent.futures import Future
+from copy import deepcopy
+
+from .codec import default_codec
 
 class RequestHandler:
 
-    def __init__(self, url: str, verify_ssl = True):
+    def __init__(self, url: str, verify_ssl = True, codec = None, session = None):
         self.base_url = url
         self.log = logging.getLogger()
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
-        if not self.session.verify:
-            from urllib3.exceptions import InsecureRequestWarning
-            requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+        self.codec = codec or default_codec()
+        self.__in_flight = dict()
+        self.__in_flight_lock = threading.Lock()
+        self.__generation = 0
+        self.session = session
+        if self.session is None:
+            import requests # imported here so that offline use does not need to load requests
+            self.session = requests.Session()
+            self.session.verify = verify_ssl
+            if not self.session.verify:
+                from urllib3.exceptions import InsecureRequestWarning
+                requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
 
     def raise_for_status(self, resp):
         if not resp.ok:
@@ -30,10 +41,43 @@ class RequestHandler:
         self.log.debug(f"Getting from '{url}'")
         resp = self.session.get(url, params=params)
         self.raise_for_status(resp)
-        return resp.json() if data_format == "json" else resp.text
+        return self.codec.loads(resp.content) if data_format == "json" else resp.text
     
 
     def get_mo(self, uri, params = None):
+        """Gets one MO, concurrent calls with the same uri and params share one request to APIC.
+        Results are only copied when a request was shared. Requests that were in flight when a post() completed are not shared with later calls, so a read after a write always sees the write.
+        """
+        with self.__in_flight_lock:
+            key = (self.__generation, uri, tuple(sorted((params or {}).items())))
+            shared = self.__in_flight.get(key)
+            owner = shared is None
+            if owner:
+                shared = {"future": Future(), "waiters": 0}
+                self.__in_flight[key] = shared
+            else:
+                shared["waiters"] += 1
+
+        if not owner:
+            self.log.debug(f"Waiting for in-flight request to '{uri}'")
+            return deepcopy(shared["future"].result())
+
+        try:
+            res = self._get_mo(uri, params = params)
+        except BaseException as e:
+            # BaseException so that waiters are released on i.e KeyboardInterrupt too
+            with self.__in_flight_lock:
+                del self.__in_flight[key]
+            shared["future"].set_exception(e)
+            raise
+
+        with self.__in_flight_lock:
+            # No new waiters can join after this, so waiters is final
+            del self.__in_flight[key]
+        shared["future"].set_result(res)
+        return deepcopy(res) if shared["waiters"] else res
+
+    def _get_mo(self, uri, params = None):
         resp = self.get(uri,params = params, data_format = "json").get("imdata", [])
         if len(resp) == 0:
             return {}
@@ -45,10 +89,15 @@ class RequestHandler:
         url = f"{self.base_url}/api/{uri}.{data_format}"
         self.log.debug(f"Posting to '{url}'")
 
-        if data_format == "json":
-            resp = self.session.post(url, json=data)
-        else:
-            resp = self.session.post(url, data=data)
+        try:
+            if data_format == "json":
+                resp = self.session.post(url, data=self.codec.dumps(data), headers={"Content-Type": "application/json"})
+            else:
+                resp = self.session.post(url, data=data)
+        finally:
+            # get_mo calls after this are not shared with requests started before the write
+            with self.__in_flight_lock:
+                self.__generation += 1
         
         self.raise_for_status(resp)
         return resp
@@ -0,0 +1,82 @@
+import unittest
+import tempfile
+
+from swiftpyaci.src.config_export import ConfigExporter, ConfigImporter
+from swiftpyaci.src.managed_object import split_dn
+
+
+SUBTREE = [
+    {"fvTenant": {"attributes": {"dn": "uni/tn-Tenant", "name": "Tenant"}}},
+    {"fvAp": {"attributes": {"dn": "uni/tn-Tenant/ap-App", "name": "App"}}},
+    {"fvAEPg": {"attributes": {"dn": "uni/tn-Tenant/ap-App/epg-Web", "name": "Web"}}},
+    {"fvAEPg": {"attributes": {"dn": "uni/tn-Tenant/ap-App/epg-Db", "name": "Db"}}},
+    {"fvBD": {"attributes": {"dn": "uni/tn-Tenant/BD-[bd/1]", "name": "bd/1"}}},
+    {"fvRsPathAtt": {"attributes": {"dn": "uni/tn-Tenant/ap-App/epg-Web/rspathAtt-[topology/pod-1/paths-101/pathep-[eth1/1]]", "tDn": "topology/pod-1/paths-101/pathep-[eth1/1]"}}},
+]
+
+STATIC_PATH_DN = "uni/tn-Tenant/ap-App/epg-Web/rspathAtt-[topology/pod-1/paths-101/pathep-[eth1/1]]"
+
+
+class FakeRequestHandler:
+    """Pages SUBTREE, answers class lookups from SUBTREE and records queries and posts"""
+    def __init__(self):
+        self.posts = list()
+        self.lookups = list()
+        self.queries = list()
+
+    def get(self, uri, params = None):
+        self.queries.append((params["target-subtree-class"], params["order-by"]) if "order-by" in params else params["rsp-prop-include"])
+        mos = SUBTREE
+        if "target-subtree-class" in params:
+            mos = sorted((mo for mo in SUBTREE if params["target-subtree-class"] in mo), key = lambda mo: next(iter(mo.values()))["attributes"]["dn"])
+        start = params["page"] * params["page-size"]
+        return {"totalCount": str(len(mos)), "imdata": mos[start:start + params["page-size"]]}
+
+    def get_mo(self, uri, params = None):
+        self.lookups.append(uri)
+        mos = [{"polUni": {"attributes": {"dn": "uni"}}}] + SUBTREE
+        return next((mo for mo in mos if f"mo/{next(iter(mo.values()))['attributes']['dn']}" == uri), {})
+
+    def post(self, uri, data = None):
+        self.posts.append((uri, data))
+
+
+class TestConfigExport(unittest.TestCase):
+
+    def test_split_dn(self):
+        self.assertEqual(split_dn(STATIC_PATH_DN), ["uni", "tn-Tenant", "ap-App", "epg-Web", "rspathAtt-[topology/pod-1/paths-101/pathep-[eth1/1]]"])
+        self.assertEqual(split_dn("uni/tn-Tenant/BD-[bd/1]"), ["uni", "tn-Tenant", "BD-[bd/1]"])
+
+    def test_export_import(self):
+        req = FakeRequestHandler()
+        with tempfile.TemporaryDirectory() as path:
+            self.assertEqual(ConfigExporter(req, path, page_size = 2, chunk_size = 1).export("uni/tn-Tenant"), 6)
+            self.assertEqual(ConfigImporter(req, path, batch_size = 10, workers = 1).import_config(), 6)
+
+        queries = ["naming-only"] * 3 + [(class_name, f"{class_name}.dn") for class_name in ["fvTenant", "fvAp", "fvAEPg", "fvBD", "fvRsPathAtt"]]
+        self.assertEqual(req.queries, queries)
+        result = [
+            ("mo/uni", {"polUni": {"attributes": {"dn": "uni"}, "children": [SUBTREE[0]]}}),
+            ("mo/uni/tn-Tenant", {"fvTenant": {"attributes": {"dn": "uni/tn-Tenant"}, "children": [SUBTREE[1], SUBTREE[4]]}}),
+            ("mo/uni/tn-Tenant/ap-App", {"fvAp": {"attributes": {"dn": "uni/tn-Tenant/ap-App"}, "children": [SUBTREE[3], SUBTREE[2]]}}),
+            ("mo/uni/tn-Tenant/ap-App/epg-Web", {"fvAEPg": {"attributes": {"dn": "uni/tn-Tenant/ap-App/epg-Web"}, "children": [SUBTREE[5]]}}),
+        ]
+        self.assertEqual(req.posts, result)
+        # Parents inside the export are known from the depth before, only the parent of the subtree root is looked up
+        self.assertEqual(req.lookups, ["mo/uni"])
+
+    def test_export_classes(self):
+        req = FakeRequestHandler()
+        with tempfile.TemporaryDirectory() as path:
+            self.assertEqual(ConfigExporter(req, path).export("uni/tn-Tenant", classes = ["fvAEPg"]), 2)
+        self.assertEqual(req.queries, [("fvAEPg", "fvAEPg.dn")])
+
+    def test_export_existing(self):
+        req = FakeRequestHandler()
+        with tempfile.TemporaryDirectory() as path:
+            ConfigExporter(req, path).export("uni/tn-Tenant")
+            with self.assertRaises(FileExistsError):
+                ConfigExporter(req, path).export("uni/tn-Tenant")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,89 @@
 import unittest
 import pathlib
 import json
+import re
+from copy import deepcopy
 
 import swiftpyaci
+from swiftpyaci.src.managed_object import ManagedObjectHandler
+from swiftpyaci.src.codec import get_codec
 
 
 
 
-def make_test_tenant():
+def load_tenant_meta():
     meta_data_folder = pathlib.Path(__file__).absolute().parent / ".meta_data"
     
     with open(meta_data_folder / "fvTenant.json") as tenant_file:
-        tenant_meta = json.load(tenant_file)
-    tenat_meta = swiftpyaci.class_meta(**list(tenant_meta.values())[0])
+        return json.load(tenant_file)
+
+
+def make_tenant_meta():
+    tenant_meta = load_tenant_meta()
+    return swiftpyaci.class_meta(**list(tenant_meta.values())[0])
+
+
+def make_test_tenant():
+    tenat_meta = make_tenant_meta()
     tenant = swiftpyaci.mo("fvTenant",parent_dn = "uni", name = "Tenant", class_meta = tenat_meta, nameAlias = "Alias", descr = "Tenant descr")
     return tenant
 
+class FakeRequestHandler:
+    """Returns tenants with attributes depending on rsp-prop-include, DNs in missing does not exist"""
+    def __init__(self, missing = ()):
+        self.props = list()
+        self.meta_calls = 0
+        self.missing = missing
+
+    def get(self, uri, params = None, use_api_uri = True):
+        self.meta_calls += 1
+        return load_tenant_meta()
+
+    def get_mo(self, uri, params = None):
+        props = params["rsp-prop-include"]
+        self.props.append(props)
+        dn = uri[len("mo/"):]
+        if dn in self.missing:
+            return {}
+        return self.tenant(dn, props)
+
+    def list(self, uri, params = None):
+        return [self.tenant(f"uni/tn-{name}", params["rsp-prop-include"]) for name in ["a", "b"]]
+
+    def tenant(self, dn, props):
+        name = dn.split("tn-")[-1]
+        attributes = {"dn": dn, "name": name}
+        if props != "naming-only":
+            attributes.update({"descr": f"{name} descr"})
+        return {"fvTenant": {"attributes": attributes}}
+
+
+class FakeClassRequestHandler:
+    """Serves the tenants in tenants from class queries and records the params"""
+    def __init__(self, tenants):
+        self.tenants = [{"fvTenant": {"attributes": {"dn": f"uni/tn-{name}", "name": name}}} for name in tenants]
+        self.params = list()
+        self.meta_calls = 0
+
+    def get(self, uri, params = None, use_api_uri = True):
+        if use_api_uri:
+            self.params.append(params)
+            start = params["page"] * params["page-size"]
+            return {"totalCount": str(len(self.tenants)), "imdata": deepcopy(self.tenants[start:start + params["page-size"]])}
+        self.meta_calls += 1
+        return load_tenant_meta()
+
+    def get_mo(self, uri, params = None):
+        self.params.append(params)
+        return next((mo for mo in self.tenants if f"mo/{mo['fvTenant']['attributes']['dn']}" == uri), {})
+
+    def list(self, uri, params = None):
+        self.params.append(params)
+        dns = re.findall(r'eq\(fvTenant\.dn,"([^"]+)"\)', params["query-target-filter"])
+        return [mo for mo in self.tenants if mo["fvTenant"]["attributes"]["dn"] in dns]
+
+
+
 class TestManagedObject(unittest.TestCase):
 
     def test_new_fv_tenant(self):
@@ -34,6 +102,117 @@ class TestManagedObject(unittest.TestCase):
         tenant.nameAlias = "new-alias"
         result = {'attributes': {'nameAlias': {'previous': 'Alias', 'new': 'new-alias', 'action': 'changed'}}}
         self.assertEqual(tenant.diff(), result)
+
+    def test_codec_round_trip(self):
+        tenant = make_test_tenant()
+        for name in ["json", "orjson"]:
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            self.assertEqual(codec.loads(codec.dumps(tenant.serilize())), tenant.serilize())
+            self.assertEqual(codec.dumps_str(tenant.serilize()), json.dumps(tenant.serilize()))
+        self.assertEqual(tenant.json(), json.dumps(tenant.serilize()))
+
+    def test_lazy_fv_tenant(self):
+        req = FakeRequestHandler()
+        tenant = swiftpyaci.mo("fvTenant", dn = "uni/tn-Tenant", class_meta = make_tenant_meta(), request_handler = req, lazy = True)
+        self.assertEqual(req.props, [])
+        self.assertEqual(tenant.name, "Tenant")
+        self.assertEqual(req.props, ["naming-only"])
+        tenant.nameAlias = "Alias"
+        self.assertEqual(tenant.descr, "Tenant descr")
+        self.assertEqual(req.props, ["naming-only", "config-only"])
+        result = {'attributes': {'nameAlias': {'previous': '', 'new': 'Alias', 'action': 'new'}}}
+        self.assertEqual(tenant.diff(), result)
+
+    def test_list_parallel(self):
+        names = [f"Tenant{i}" for i in range(7)]
+        req = FakeClassRequestHandler(names)
+        handler = ManagedObjectHandler("fvTenant", request_handler = req)
+        tenants = list(handler.list(workers = 2, page_size = 3))
+        self.assertEqual([tenant.name for tenant in tenants], names)
+        self.assertEqual([tenant.dn for tenant in tenants], [f"uni/tn-{name}" for name in names])
+        self.assertEqual(req.params, [{"page": page, "page-size": 3, "order-by": "fvTenant.dn"} for page in range(3)])
+
+        req.params.clear()
+        list(handler.list(workers = 2, page_size = 3, order_by = "fvTenant.name"))
+        self.assertEqual(req.params, [{"page": page, "page-size": 3, "order-by": "fvTenant.name"} for page in range(3)])
+
+    def test_lazy_fv_tenant_json(self):
+        req = FakeRequestHandler()
+        tenant = swiftpyaci.mo(None, dn = "uni/tn-Tenant", request_handler = req, lazy = True)
+        result = {"fvTenant": {"attributes": {"dn": "uni/tn-Tenant", "name": "Tenant", "descr": "Tenant descr"}}}
+        self.assertEqual(tenant.json(), json.dumps(result))
+        self.assertEqual(req.props, ["all"])
+
+    def test_lazy_fv_tenant_config(self):
+        req = FakeRequestHandler()
+        tenant = swiftpyaci.mo(None, dn = "uni/tn-Tenant", request_handler = req, lazy = True)
+        self.assertEqual(tenant.config()["fvTenant"]["attributes"]["descr"], "Tenant descr")
+        self.assertEqual(req.props, ["config-only"])
+
+    def test_lazy_fv_tenant_missing(self):
+        req = FakeRequestHandler(missing = ["uni/tn-Tenant"])
+        tenant = swiftpyaci.mo(None, dn = "uni/tn-Tenant", request_handler = req, lazy = True)
+        self.assertFalse(tenant.exists)
+        for i in range(3):
+            self.assertIsNone(tenant.class_name)
+        self.assertIsNone(tenant.class_meta)
+        self.assertEqual(req.props, ["naming-only"])
+
+    def test_lazy_fv_tenant_dn_only(self):
+        req = FakeRequestHandler()
+        tenant = swiftpyaci.mo(None, dn = "uni/tn-Tenant", request_handler = req, lazy = True)
+        self.assertEqual(tenant.descr, "Tenant descr")
+        self.assertEqual(req.props, ["config-only"])
+        self.assertEqual(req.meta_calls, 0)
+        self.assertEqual(tenant.class_name, "fvTenant")
+
+    def test_lazy_list_children(self):
+        req = FakeRequestHandler()
+        uni = swiftpyaci.mo(None, dn = "uni", request_handler = req, lazy = True)
+        tenants = list(uni.list_children())
+        self.assertEqual([tenant.name for tenant in tenants], ["a", "b"])
+        self.assertEqual(req.meta_calls, 1)
+        self.assertEqual([tenant.descr for tenant in tenants], ["a descr", "b descr"])
+        self.assertEqual(req.props, ["config-only", "config-only"])
+        self.assertEqual(req.meta_calls, 1)
+
+    def test_class_meta_cached(self):
+        req = FakeRequestHandler()
+        uni = swiftpyaci.mo(None, dn = "uni", request_handler = req, lazy = True)
+        first = list(uni.list_children())
+        second = list(uni.list_children())
+        self.assertIs(first[0].class_meta, second[1].class_meta)
+        self.assertIs(ManagedObjectHandler("fvTenant", request_handler = req).class_meta, first[0].class_meta)
+        self.assertEqual(req.meta_calls, 1)
+
+    def test_get_many(self):
+        req = FakeClassRequestHandler(["a", "b", "c"])
+        handler = ManagedObjectHandler("fvTenant", request_handler = req)
+        tenants = handler.get_many(["uni/tn-c", "uni/tn-missing", "uni/tn-a", "uni/tn-b", "uni/tn-a"], chunk_size = 2, workers = 1)
+        self.assertEqual(list(tenants), ["uni/tn-c", "uni/tn-a", "uni/tn-b"])
+        self.assertEqual(req.params, [
+            {"query-target-filter": 'or(eq(fvTenant.dn,"uni/tn-c"),eq(fvTenant.dn,"uni/tn-missing"))'},
+            {"query-target-filter": 'or(eq(fvTenant.dn,"uni/tn-a"),eq(fvTenant.dn,"uni/tn-b"))'},
+        ])
+        for dn, tenant in tenants.items():
+            self.assertIs(tenant.exists, True)
+            self.assertEqual(tenant.dn, dn)
+            self.assertFalse(tenant.have_diff())
+
+    def test_apic_get_many_unknown_class(self):
+        req = FakeClassRequestHandler(["a", "b"])
+        apic = swiftpyaci.apic(None, None, None)
+        apic.request_handler = req
+        tenants = apic.get_many(["uni/tn-b", "uni/tn-missing", "uni/tn-a"], workers = 1)
+        self.assertEqual(list(tenants), ["uni/tn-b", "uni/tn-a"])
+        self.assertEqual(req.meta_calls, 1)
+        self.assertEqual(req.params, [{"rsp-prop-include": "all"}] * 3)
+        self.assertTrue(tenants["uni/tn-a"].exists)
+        self.assertEqual(tenants["uni/tn-a"].name, "a")
+        self.assertEqual(tenants["uni/tn-a"].class_name, "fvTenant")
     
    
 
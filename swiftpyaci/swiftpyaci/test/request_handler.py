@@ -0,0 +1,94 @@
+import unittest
+import threading
+import time
+import json
+
+from swiftpyaci.src.request_handler import RequestHandler
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.ok = True
+        self.content = json.dumps(data).encode()
+        self.text = self.content.decode()
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Blocks get until release is set so that concurrent callers pile up on the same request"""
+    def __init__(self, error = None):
+        self.calls = 0
+        self.error = error
+        self.release = threading.Event()
+
+    def get(self, url, params = None):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return FakeResponse({"imdata": [{"fvTenant": {"attributes": {"dn": "uni/tn-Tenant", "name": "Tenant"}}}]})
+
+    def post(self, url, data = None, headers = None):
+        return FakeResponse({"imdata": []})
+
+
+def get_mo_concurrent(req, callers = 5, post = False):
+    """Runs get_mo from callers threads, if post is set a post is done after the first caller has started"""
+    results = list()
+
+    def get_mo():
+        try:
+            results.append(req.get_mo("mo/uni/tn-Tenant", params = {"rsp-prop-include": "all"}))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target = get_mo) for i in range(callers)]
+    threads[0].start()
+    time.sleep(0.1)
+    if post:
+        req.post("mo/uni/tn-Tenant", data = {"fvTenant": {"attributes": {"descr": "new"}}})
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)
+    req.session.release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestRequestHandler(unittest.TestCase):
+
+    def test_get_mo_coalesced(self):
+        req = RequestHandler("https://apic", session = FakeSession())
+        results = get_mo_concurrent(req)
+        self.assertEqual(req.session.calls, 1)
+        self.assertEqual(len(results), 5)
+        for res in results:
+            self.assertEqual(res, {"fvTenant": {"attributes": {"dn": "uni/tn-Tenant", "name": "Tenant"}}})
+        self.assertEqual(len({id(res) for res in results}), 5)
+
+    def test_get_mo_coalesced_error(self):
+        error = ConnectionError("APIC unreachable")
+        req = RequestHandler("https://apic", session = FakeSession(error = error))
+        results = get_mo_concurrent(req)
+        self.assertEqual(req.session.calls, 1)
+        self.assertEqual(results, [error] * 5)
+
+    def test_get_mo_not_shared_after_post(self):
+        req = RequestHandler("https://apic", session = FakeSession())
+        results = get_mo_concurrent(req, callers = 3, post = True)
+        self.assertEqual(req.session.calls, 2)
+        self.assertEqual(len(results), 3)
+
+    def test_get_mo_sequential(self):
+        req = RequestHandler("https://apic", session = FakeSession())
+        req.session.release.set()
+        req.get_mo("mo/uni/tn-Tenant")
+        req.get_mo("mo/uni/tn-Tenant")
+        self.assertEqual(req.session.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()